@@ -4,18 +4,24 @@ Main application script for Mortgage Statement Parser
 Usage:
     python app.py <path_to_mortgage_statement>
     python app.py --url <url_to_mortgage_statement>
+    python app.py --batch <directory_of_mortgage_statements>
+
+Requires Python 3.10+. Saved JSON has a flat parsed_fields object: the dates
+are top-level keys (statement_date, due_date, payment_date,
+loan_origination_date) rather than a nested 'dates' object.
 """
 
 import sys
 import os
-import json
-import argparse
-from dotenv import load_dotenv
-from mortgage_parser import MortgageStatementParser
+import io
+from functools import lru_cache
 
 
+@lru_cache(maxsize=1)
 def load_credentials():
     """Load Veryfi credentials from environment variables."""
+    from dotenv import load_dotenv
+
     load_dotenv()
     
     client_id = os.getenv('VERYFI_CLIENT_ID')
@@ -33,12 +39,98 @@ def load_credentials():
     return client_id, client_secret, username, api_key
 
 
-def main():
-    """Main application entry point."""
-    parser = argparse.ArgumentParser(
-        description='Parse mortgage statements using Veryfi SDK',
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+# File extensions picked up by --batch
+STATEMENT_EXTENSIONS = ('.pdf', '.jpg', '.jpeg', '.png')
+
+# Buffer size for large JSON writes (file output and --raw display)
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def find_statements(directory: str) -> list:
+    """
+    Find the mortgage statement files (PDFs and images) in a directory.
+    
+    Args:
+        directory: Directory to search (not recursive)
+        
+    Returns:
+        Sorted list of file paths
+        
+    Raises:
+        FileNotFoundError: If the directory doesn't exist or holds no statements
+    """
+    if not os.path.isdir(directory):
+        raise FileNotFoundError(f"Directory not found: {directory}")
+    
+    file_paths = sorted(
+        entry.path for entry in os.scandir(directory)
+        if entry.is_file() and entry.name.lower().endswith(STATEMENT_EXTENSIONS)
+    )
+    if not file_paths:
+        raise FileNotFoundError(f"No mortgage statements found in: {directory}")
+    
+    return file_paths
+
+
+def _json_default(obj):
+    """Serialize parser dataclasses for the standard library encoder."""
+    import dataclasses
+    
+    if dataclasses.is_dataclass(obj):
+        # Shallow on purpose: nested values are handed back to the encoder
+        return {field.name: getattr(obj, field.name) for field in dataclasses.fields(obj)}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def write_json(obj, stream) -> None:
+    """
+    Write an object as indented JSON to a binary stream.
+    
+    Uses orjson when it is installed. Otherwise the standard library encoder
+    streams its chunks into the stream, so the document is never held as one
+    Python string.
+    
+    Args:
+        obj: JSON-serializable object (dataclasses included)
+        stream: Binary stream to write to (left open)
+    """
+    try:
+        import orjson
+    except ImportError:
+        import json
+        
+        # newline='\n' so Windows doesn't turn each '\n' into '\r\n'
+        text = io.TextIOWrapper(stream, encoding='utf-8', newline='\n', write_through=True)
+        try:
+            # ensure_ascii=False matches orjson, which emits UTF-8 as is
+            json.dump(obj, text, indent=2, ensure_ascii=False, default=_json_default)
+        finally:
+            # Detach so closing the wrapper never closes the underlying stream
+            text.detach()
+        return
+    
+    stream.write(orjson.dumps(obj, option=orjson.OPT_INDENT_2))
+
+
+def write_json_stdout(obj) -> None:
+    """
+    Write an object as indented JSON to stdout through a 1 MiB buffer.
+    
+    Args:
+        obj: JSON-serializable object, followed by a newline
+    """
+    sys.stdout.flush()
+    out = io.BufferedWriter(sys.stdout.buffer, buffer_size=WRITE_BUFFER_SIZE)
+    try:
+        write_json(obj, out)
+        out.write(b"\n")
+        out.flush()
+    finally:
+        # Detach so closing the wrapper never closes the real stdout
+        out.detach()
+
+
+EPILOG = """
 Examples:
   Parse a local file:
     python app.py statement.pdf
@@ -47,10 +139,76 @@ Examples:
   Parse from URL:
     python app.py --url https://example.com/statement.pdf
   
+  Parse every PDF/image in a directory concurrently:
+    python app.py --batch statements/
+  
   Save output to JSON:
     python app.py statement.pdf --output result.json
         """
-    )
+
+# Pre-rendered output of build_parser(full_help=True).format_help(), printed
+# as-is so --help never builds a parser or imports anything. Keep it in sync
+# when adding options (test_parser.py checks that every option is listed).
+HELP_TEXT = """usage: app.py [-h] [--url URL] [--batch DIR] [--output OUTPUT] [--raw]
+              [file_path]
+
+Parse mortgage statements using Veryfi SDK
+
+positional arguments:
+  file_path             Path to the mortgage statement file (image or PDF)
+
+options:
+  -h, --help            show this help message and exit
+  --url URL             URL of the mortgage statement to parse
+  --batch DIR           Directory of mortgage statements to parse concurrently
+  --output OUTPUT, -o OUTPUT
+                        Output file path for JSON results (optional)
+  --raw                 Show raw Veryfi response
+""" + EPILOG + "\n"
+
+
+def wants_help(argv: list) -> bool:
+    """
+    Check whether argparse would treat argv as a help request.
+    
+    argparse accepts any unambiguous prefix of a long option, so '--he' and
+    '--hel' count as '--help' too.
+    
+    Args:
+        argv: Command line arguments, without the program name
+        
+    Returns:
+        True if help was requested
+    """
+    # Everything after '--' is positional, as in argparse
+    if '--' in argv:
+        argv = argv[:argv.index('--')]
+    
+    return any(arg == '-h' or (len(arg) > 2 and '--help'.startswith(arg)) for arg in argv)
+
+
+def build_parser(full_help: bool = False) -> 'argparse.ArgumentParser':
+    """
+    Build the command line argument parser.
+    
+    Args:
+        full_help: Include the examples epilog (used to render HELP_TEXT)
+        
+    Returns:
+        Configured ArgumentParser
+    """
+    import argparse
+    
+    if full_help:
+        parser = argparse.ArgumentParser(
+            description='Parse mortgage statements using Veryfi SDK',
+            formatter_class=argparse.RawDescriptionHelpFormatter,
+            epilog=EPILOG
+        )
+    else:
+        parser = argparse.ArgumentParser(
+            description='Parse mortgage statements using Veryfi SDK'
+        )
     
     parser.add_argument(
         'file_path',
@@ -61,6 +219,11 @@ Examples:
         '--url',
         help='URL of the mortgage statement to parse'
     )
+    parser.add_argument(
+        '--batch',
+        metavar='DIR',
+        help='Directory of mortgage statements to parse concurrently'
+    )
     parser.add_argument(
         '--output', '-o',
         help='Output file path for JSON results (optional)'
@@ -71,16 +234,36 @@ Examples:
         help='Show raw Veryfi response'
     )
     
-    args = parser.parse_args()
+    return parser
+
+
+def main():
+    """Main application entry point."""
+    argv = sys.argv[1:]
+    
+    # Answer help (and a bare invocation) from the pre-rendered text before
+    # building a parser
+    if not argv or wants_help(argv):
+        sys.stdout.write(HELP_TEXT)
+        return
+    
+    parser = build_parser()
+    
+    args = parser.parse_args(argv)
     
     # Validate input
-    if not args.file_path and not args.url:
-        parser.error("Please provide either a file path or --url")
+    sources = sum(1 for source in (args.file_path, args.url, args.batch) if source)
+    if not sources:
+        parser.error("Please provide either a file path, --url or --batch")
     
-    if args.file_path and args.url:
-        parser.error("Please provide either a file path or --url, not both")
+    if sources > 1:
+        parser.error("Please provide only one of a file path, --url or --batch")
     
     try:
+        # Deferred so that --help and argument errors don't pay for the
+        # Veryfi SDK import
+        from mortgage_parser import MortgageStatementParser
+
         # Load credentials
         print("Loading Veryfi credentials...")
         client_id, client_secret, username, api_key = load_credentials()
@@ -91,31 +274,59 @@ Examples:
             client_id, client_secret, username, api_key
         )
         
-        # Parse the document
-        if args.file_path:
+        # Parse the document(s), keyed by source
+        keep_raw = args.raw or args.output is not None
+        failures = {}
+        if args.batch:
+            file_paths = find_statements(args.batch)
+            print(f"Processing {len(file_paths)} files from: {args.batch}")
+            results = {}
+            for file_path, result in zip(file_paths, parser_instance.parse_many(
+                    file_paths, keep_raw=keep_raw, return_exceptions=True)):
+                # A failed document shouldn't discard the rest of the batch
+                if isinstance(result, Exception):
+                    failures[file_path] = result
+                else:
+                    results[file_path] = result
+        elif args.file_path:
             print(f"Processing file: {args.file_path}")
-            result = parser_instance.parse_mortgage_statement(args.file_path)
+            results = {
+                args.file_path: parser_instance.parse_mortgage_statement(args.file_path, keep_raw=keep_raw)
+            }
         else:
             print(f"Processing URL: {args.url}")
-            result = parser_instance.parse_mortgage_statement_from_url(args.url)
+            results = {
+                args.url: parser_instance.parse_mortgage_statement_from_url(args.url, keep_raw=keep_raw)
+            }
         
         print("\n" + "="*50)
         print("Processing complete!")
         print("="*50 + "\n")
         
         # Display results
-        if args.raw:
-            print("=== RAW VERYFI RESPONSE ===")
-            print(json.dumps(result.get('raw_response', {}), indent=2))
-        else:
-            print(parser_instance.format_output(result))
+        for source, result in results.items():
+            if args.batch:
+                print(f"--- {source} ---")
+            if args.raw:
+                print("=== RAW VERYFI RESPONSE ===")
+                write_json_stdout(result.raw_response or {})
+            else:
+                print(parser_instance.format_output(result))
         
-        # Save to file if requested
+        # Save to file if requested; batches are saved as {path: result}
         if args.output:
-            with open(args.output, 'w') as f:
-                json.dump(result, f, indent=2)
+            output = results if args.batch else next(iter(results.values()))
+            with open(args.output, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                write_json(output, f)
             print(f"\nResults saved to: {args.output}")
         
+        if failures:
+            print(f"\nFailed to process {len(failures)} of {len(failures) + len(results)} files:",
+                  file=sys.stderr)
+            for file_path, error in failures.items():
+                print(f"  {file_path}: {error}", file=sys.stderr)
+            sys.exit(1)
+        
     except FileNotFoundError as e:
         print(f"Error: {e}", file=sys.stderr)
         sys.exit(1)
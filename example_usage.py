@@ -6,23 +6,35 @@ in your own Python code.
 """
 
 import os
+from functools import lru_cache
 from dotenv import load_dotenv
-from mortgage_parser import MortgageStatementParser
+
+
+@lru_cache(maxsize=1)
+def _get_creds():
+    """Load Veryfi credentials from .env once per process"""
+    load_dotenv()
+    return (
+        os.getenv('VERYFI_CLIENT_ID'),
+        os.getenv('VERYFI_CLIENT_SECRET'),
+        os.getenv('VERYFI_USERNAME'),
+        os.getenv('VERYFI_API_KEY'),
+    )
 
 
 def example_parse_local_file():
     """Example: Parse a local mortgage statement file"""
+    from mortgage_parser import MortgageStatementParser
+
     print("Example 1: Parsing a local file\n" + "="*50)
     
-    # Load credentials from .env file
-    load_dotenv()
-    
-    # Initialize the parser
+    # Load credentials from .env file and initialize the parser
+    cid, cs, un, ak = _get_creds()
     parser = MortgageStatementParser(
-        client_id=os.getenv('VERYFI_CLIENT_ID'),
-        client_secret=os.getenv('VERYFI_CLIENT_SECRET'),
-        username=os.getenv('VERYFI_USERNAME'),
-        api_key=os.getenv('VERYFI_API_KEY')
+        client_id=cid,
+        client_secret=cs,
+        username=un,
+        api_key=ak
     )
     
     # Parse a mortgage statement
@@ -36,10 +48,10 @@ def example_parse_local_file():
         print(parser.format_output(result))
         
         # Access specific fields
-        parsed = result['parsed_fields']
+        parsed = result.parsed_fields
         print("\nAccessing specific fields:")
-        print(f"Outstanding Balance: ${parsed.get('outstanding_balance', 'N/A')}")
-        print(f"APR: {parsed.get('apr', 'N/A')}%")
+        print(f"Outstanding Balance: ${parsed.outstanding_balance or 'N/A'}")
+        print(f"APR: {parsed.apr or 'N/A'}%")
         
     except FileNotFoundError:
         print(f"File not found: {file_path}")
@@ -50,15 +62,16 @@ def example_parse_local_file():
 
 def example_parse_from_url():
     """Example: Parse a mortgage statement from a URL"""
+    from mortgage_parser import MortgageStatementParser
+
     print("\n\nExample 2: Parsing from URL\n" + "="*50)
     
-    load_dotenv()
-    
+    cid, cs, un, ak = _get_creds()
     parser = MortgageStatementParser(
-        client_id=os.getenv('VERYFI_CLIENT_ID'),
-        client_secret=os.getenv('VERYFI_CLIENT_SECRET'),
-        username=os.getenv('VERYFI_USERNAME'),
-        api_key=os.getenv('VERYFI_API_KEY')
+        client_id=cid,
+        client_secret=cs,
+        username=un,
+        api_key=ak
     )
     
     # Parse from URL
@@ -76,26 +89,27 @@ def example_parse_from_url():
 
 def example_custom_processing():
     """Example: Custom processing of parsed data"""
+    from mortgage_parser import MortgageStatementParser
+
     print("\n\nExample 3: Custom data processing\n" + "="*50)
     
-    load_dotenv()
-    
+    cid, cs, un, ak = _get_creds()
     parser = MortgageStatementParser(
-        client_id=os.getenv('VERYFI_CLIENT_ID'),
-        client_secret=os.getenv('VERYFI_CLIENT_SECRET'),
-        username=os.getenv('VERYFI_USERNAME'),
-        api_key=os.getenv('VERYFI_API_KEY')
+        client_id=cid,
+        client_secret=cs,
+        username=un,
+        api_key=ak
     )
     
     file_path = "path/to/your/mortgage_statement.pdf"
     
     try:
         result = parser.parse_mortgage_statement(file_path)
-        parsed = result['parsed_fields']
+        parsed = result.parsed_fields
         
         # Example: Calculate equity if we have loan amount and balance
-        loan_amount = parsed.get('loan_amount')
-        outstanding = parsed.get('outstanding_balance')
+        loan_amount = parsed.loan_amount
+        outstanding = parsed.outstanding_balance
         
         if loan_amount and outstanding:
             principal_paid = loan_amount - outstanding
@@ -108,7 +122,7 @@ def example_custom_processing():
             print(f"  Equity Built: {equity_percentage:.2f}%")
         
         # Example: Check if APR is competitive
-        apr = parsed.get('apr')
+        apr = parsed.apr
         if apr:
             if apr < 3.0:
                 rate_status = "Excellent"
@@ -135,13 +149,7 @@ def main():
     print()
     
     # Check if credentials are set
-    load_dotenv()
-    if not all([
-        os.getenv('VERYFI_CLIENT_ID'),
-        os.getenv('VERYFI_CLIENT_SECRET'),
-        os.getenv('VERYFI_USERNAME'),
-        os.getenv('VERYFI_API_KEY')
-    ]):
+    if not all(_get_creds()):
         print("ERROR: Veryfi credentials not found!")
         print("Please copy .env.example to .env and fill in your credentials.")
         return
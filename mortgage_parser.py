@@ -6,12 +6,135 @@ using the Veryfi OCR API. It extracts key information such as loan amounts,
 APR, terms, property address, and dates.
 """
 
-import os
 import json
 import re
-from typing import Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Union
+from requests.adapters import HTTPAdapter
 from veryfi import Client
 
+# Document categories sent with every Veryfi request. The SDK signs requests
+# using str() of each payload value, so these must be passed as a list: a
+# tuple would sign as "(...)" while the JSON body carries "[...]".
+_MORTGAGE_CATEGORIES = ('mortgage', 'financial', 'bank statement')
+
+
+# OCR text patterns, compiled once at import. Matching is case-insensitive so
+# the OCR text never needs a lowercased copy.
+_APR_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'apr[:\s]+(\d+\.?\d*)\s*%?',
+    r'annual percentage rate[:\s]+(\d+\.?\d*)\s*%?',
+    r'interest rate[:\s]+(\d+\.?\d*)\s*%?',
+)]
+
+_TERM_RES = [re.compile(p, re.IGNORECASE) for p in (
+    r'(\d+)\s*year\s*(?:fixed|term|loan)?',
+    r'(\d+)\s*month\s*(?:term|loan)?',
+    r'loan term[:\s]+(\d+\s*(?:year|month)s?)',
+)]
+
+# Simple address pattern (can be enhanced)
+_ADDRESS_RE = re.compile(
+    r'property(?:\s+address)?[:\s]+([^\n]+(?:\n[^\n]+)?)', re.IGNORECASE
+)
+
+# Custom field names that carry the APR
+_APR_NAME_RE = re.compile(r'apr|interest rate', re.IGNORECASE)
+
+# Line item description keywords and the field each one identifies
+_LINE_ITEM_KEYWORDS = (
+    ('original loan', 'loan_amount'),
+    ('loan amount', 'loan_amount'),
+    ('principal balance', 'outstanding_balance'),
+    ('outstanding balance', 'outstanding_balance'),
+    ('current balance', 'outstanding_balance'),
+    ('remaining balance', 'outstanding_balance'),
+)
+_LINE_ITEM_FIELDS = dict(_LINE_ITEM_KEYWORDS)
+_LINE_ITEM_FIELD_COUNT = len(set(_LINE_ITEM_FIELDS.values()))
+_LINE_ITEM_RE = re.compile(
+    '|'.join(re.escape(keyword) for keyword, _ in _LINE_ITEM_KEYWORDS),
+    # ASCII-only folding keeps every match a key of _LINE_ITEM_FIELDS once lowercased
+    re.IGNORECASE | re.ASCII
+)
+
+_PAYMENT_DATE_RE = re.compile(
+    r'payment date[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', re.IGNORECASE
+)
+
+_ORIGIN_DATE_RE = re.compile(
+    r'(?:loan|origination) date[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', re.IGNORECASE
+)
+
+# Display labels for the date fields of ParsedFields
+_DATE_LABELS = {
+    'statement_date': 'Statement Date',
+    'due_date': 'Due Date',
+    'payment_date': 'Payment Date',
+    'loan_origination_date': 'Loan Origination Date',
+}
+
+
+@dataclass(slots=True)
+class ParsedFields:
+    """Mortgage fields extracted from a single statement."""
+    loan_amount: Optional[float] = None
+    outstanding_balance: Optional[float] = None
+    apr: Optional[float] = None
+    loan_terms: Optional[str] = None
+    property_address: Optional[str] = None
+    payment_amount: Optional[float] = None
+    lender_name: Optional[str] = None
+    statement_date: Optional[str] = None
+    due_date: Optional[str] = None
+    payment_date: Optional[str] = None
+    loan_origination_date: Optional[str] = None
+
+
+@dataclass(slots=True)
+class MortgageStatement:
+    """Result of parsing a mortgage statement."""
+    parsed_fields: ParsedFields
+    confidence_score: Optional[float] = None
+    document_type: Optional[str] = None
+    raw_response: Optional[Dict] = None
+
+
+@lru_cache(maxsize=1)
+def _get_client(client_id: str, client_secret: str, username: str, api_key: str) -> Client:
+    """
+    Return a Veryfi client shared by every parser using the same credentials.
+    
+    Reusing one client keeps its HTTP session, and so its TCP/TLS connections,
+    alive across documents instead of reconnecting per parser instance.
+    """
+    return Client(client_id, client_secret, username, api_key)
+
+
+def _ensure_pool_size(client: Client, size: int) -> None:
+    """
+    Make sure the client's HTTP connection pool can hold `size` connections.
+    
+    The SDK talks to the API through a requests.Session whose default pool
+    keeps 10 connections; with more concurrent uploads than that, urllib3
+    discards the extra connections instead of keeping them alive.
+    """
+    # Relies on veryfi internals: Client.__init__ stores its requests.Session
+    # as `_session` (verified against veryfi 3.3.x), and HTTPAdapter keeps its
+    # pool size in `_pool_maxsize`. Both are looked up defensively.
+    session = getattr(client, '_session', None)
+    if session is None:
+        return
+    
+    adapter = session.get_adapter('https://')
+    if getattr(adapter, '_pool_maxsize', 0) < size:
+        # The client is shared process-wide; release the old pool's
+        # connections rather than leaking them
+        adapter.close()
+        session.mount('https://', HTTPAdapter(pool_connections=size, pool_maxsize=size))
+
 
 class MortgageStatementParser:
     """
@@ -36,107 +159,234 @@ class MortgageStatementParser:
             username: Veryfi username
             api_key: Veryfi API key
         """
-        self.client = Client(client_id, client_secret, username, api_key)
+        self.client = _get_client(client_id, client_secret, username, api_key)
         
-    def parse_mortgage_statement(self, file_path: str) -> Dict[str, Any]:
+    def parse_mortgage_statement(self, file_path: str, keep_raw: bool = False) -> MortgageStatement:
         """
         Parse a mortgage statement from an image or PDF file.
         
         Args:
             file_path: Path to the mortgage statement file
+            keep_raw: Include the full Veryfi response as raw_response
             
         Returns:
-            Dictionary containing parsed mortgage information
+            MortgageStatement containing parsed mortgage information
             
         Raises:
             FileNotFoundError: If the file doesn't exist
             Exception: If parsing fails
         """
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
         # Process document with Veryfi
-        categories = ['mortgage', 'financial', 'bank statement']
-        response = self.client.process_document(file_path, categories=categories)
+        response = self._process_file(file_path)
         
         # Extract mortgage-specific fields
-        mortgage_data = self._extract_mortgage_fields(response)
+        mortgage_data = self._extract_mortgage_fields(response, keep_raw=keep_raw)
         
         return mortgage_data
     
-    def parse_mortgage_statement_from_url(self, file_url: str) -> Dict[str, Any]:
+    def parse_many(self, file_paths: List[str], max_workers: int = 8,
+                   keep_raw: bool = False,
+                   return_exceptions: bool = False) -> List[Union[MortgageStatement, Exception]]:
+        """
+        Parse several mortgage statements concurrently through the same Veryfi client.
+        
+        Veryfi calls are network-bound, so documents are uploaded from a thread
+        pool and each response is parsed as soon as it arrives.
+        
+        Args:
+            file_paths: Paths to the mortgage statement files
+            max_workers: Maximum number of documents processed at once
+            keep_raw: Include the full Veryfi response as raw_response
+            return_exceptions: Put the exception raised for a failed document in
+                its slot instead of aborting the whole batch
+            
+        Returns:
+            List of MortgageStatement results (or exceptions, with
+            return_exceptions), in the same order as file_paths
+            
+        Raises:
+            FileNotFoundError: If one of the files doesn't exist
+            Exception: If parsing any document fails (without return_exceptions)
+        """
+        results = [None] * len(file_paths)
+        
+        # One kept-alive connection per worker
+        _ensure_pool_size(self.client, max_workers)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(self._process_file, file_path): index
+                for index, file_path in enumerate(file_paths)
+            }
+            try:
+                for future in as_completed(futures):
+                    try:
+                        results[futures[future]] = self._extract_mortgage_fields(
+                            future.result(), keep_raw=keep_raw
+                        )
+                    except Exception as e:
+                        if not return_exceptions:
+                            raise
+                        results[futures[future]] = e
+            except BaseException:
+                # Don't start uploads that are still queued behind a failure
+                for future in futures:
+                    future.cancel()
+                raise
+        
+        return results
+    
+    def _process_file(self, file_path: str) -> Dict:
+        """
+        Send a local file to Veryfi and return the raw response.
+        
+        Args:
+            file_path: Path to the mortgage statement file
+            
+        Returns:
+            Raw response from Veryfi API
+            
+        Raises:
+            FileNotFoundError: If the file doesn't exist
+        """
+        # The SDK opens the file itself, so let that open report a missing
+        # file instead of stat()ing it up front
+        try:
+            return self.client.process_document(file_path, categories=list(_MORTGAGE_CATEGORIES))
+        except FileNotFoundError as e:
+            raise FileNotFoundError(f"File not found: {file_path}") from e
+    
+    def parse_mortgage_statement_from_url(self, file_url: str, keep_raw: bool = False) -> MortgageStatement:
         """
         Parse a mortgage statement from a URL.
         
         Args:
             file_url: URL of the mortgage statement
+            keep_raw: Include the full Veryfi response as raw_response
             
         Returns:
-            Dictionary containing parsed mortgage information
+            MortgageStatement containing parsed mortgage information
         """
-        categories = ['mortgage', 'financial', 'bank statement']
-        response = self.client.process_document_url(file_url, categories=categories)
+        response = self.client.process_document_url(file_url, categories=list(_MORTGAGE_CATEGORIES))
         
-        mortgage_data = self._extract_mortgage_fields(response)
+        mortgage_data = self._extract_mortgage_fields(response, keep_raw=keep_raw)
         
         return mortgage_data
     
-    def _extract_mortgage_fields(self, veryfi_response: Dict) -> Dict[str, Any]:
+    def _extract_mortgage_fields(self, veryfi_response: Dict, keep_raw: bool = False) -> MortgageStatement:
         """
         Extract mortgage-specific fields from Veryfi response.
         
         Args:
             veryfi_response: Raw response from Veryfi API
+            keep_raw: Include veryfi_response as raw_response
             
         Returns:
-            Dictionary with structured mortgage data
+            MortgageStatement with structured mortgage data
         """
-        # Extract text content for parsing
-        text_content = veryfi_response.get('ocr_text', '')
-        line_items = veryfi_response.get('line_items', [])
-        
-        # Initialize mortgage data structure
-        mortgage_data = {
-            'raw_response': veryfi_response,
-            'parsed_fields': {
-                'loan_amount': self._extract_loan_amount(veryfi_response),
-                'outstanding_balance': self._extract_outstanding_balance(veryfi_response),
-                'apr': self._extract_apr(veryfi_response),
-                'loan_terms': self._extract_loan_terms(veryfi_response),
-                'property_address': self._extract_property_address(veryfi_response),
-                'dates': self._extract_dates(veryfi_response),
-                'payment_amount': veryfi_response.get('total', None),
-                'lender_name': veryfi_response.get('vendor', {}).get('name', None),
-            },
-            'confidence_score': veryfi_response.get('confidence', None),
-            'document_type': veryfi_response.get('document_type', None),
-        }
+        # Extract text content once and share it between the extractors
+        text = veryfi_response.get('ocr_text') or ''
+        
+        # Walk line items and custom fields a single time for all extractors
+        line_fields = self._scan_line_items(veryfi_response.get('line_items', []))
+        custom_fields = self._scan_custom_fields(veryfi_response.get('custom_fields', []))
+        
+        parsed_fields = ParsedFields(
+            loan_amount=self._extract_loan_amount(line_fields, custom_fields),
+            outstanding_balance=self._extract_outstanding_balance(veryfi_response, line_fields),
+            apr=self._extract_apr(custom_fields, text),
+            loan_terms=self._extract_loan_terms(text),
+            property_address=self._extract_property_address(veryfi_response, text),
+            payment_amount=veryfi_response.get('total', None),
+            lender_name=veryfi_response.get('vendor', {}).get('name', None),
+            **self._extract_dates(veryfi_response, custom_fields, text),
+        )
+        
+        return MortgageStatement(
+            parsed_fields=parsed_fields,
+            confidence_score=veryfi_response.get('confidence', None),
+            document_type=veryfi_response.get('document_type', None),
+            # The raw payload can be large; only hold on to it when asked
+            raw_response=veryfi_response if keep_raw else None,
+        )
+    
+    def _scan_line_items(self, items: List[Dict]) -> Dict[str, Any]:
+        """
+        Map line items to mortgage fields in a single pass.
         
-        return mortgage_data
+        Args:
+            items: Line items from the Veryfi response
+            
+        Returns:
+            Dictionary keyed by field name (see _LINE_ITEM_KEYWORDS) holding the
+            total of the first line item whose description matches
+        """
+        found = {}
+        
+        # Bind hot-loop lookups to locals once instead of per item
+        finditer = _LINE_ITEM_RE.finditer
+        keyword_fields = _LINE_ITEM_FIELDS
+        record = found.setdefault
+        
+        for item in items:
+            description = item.get('description')
+            if not isinstance(description, str):
+                continue
+            for match in finditer(description):
+                record(keyword_fields[match.group(0).lower()], item.get('total', None))
+            if len(found) == _LINE_ITEM_FIELD_COUNT:
+                break
+        
+        return found
     
-    def _extract_loan_amount(self, response: Dict) -> Optional[float]:
-        """Extract original loan amount from the response."""
-        # Check line items for loan amount
-        for item in response.get('line_items', []):
-            description = str(item.get('description', '')).lower()
-            if 'original loan' in description or 'loan amount' in description:
-                return item.get('total', None)
-        
-        # Check custom fields
-        for field in response.get('custom_fields', []):
-            if 'loan amount' in str(field.get('name', '')).lower():
-                return field.get('value', None)
+    def _scan_custom_fields(self, fields: List[Dict]) -> Dict[str, Any]:
+        """
+        Map custom fields to mortgage fields in a single pass.
         
-        return None
+        Args:
+            fields: Custom fields from the Veryfi response
+            
+        Returns:
+            Dictionary with the first 'loan_amount', 'apr', 'payment_date' and
+            'loan_origination_date' values found
+        """
+        found = {}
+        
+        for field in fields:
+            field_name = str(field.get('name', '')).lower()
+            if 'loan_amount' not in found and 'loan amount' in field_name:
+                # An empty custom field must fall through to the line items
+                if field.get('value'):
+                    found['loan_amount'] = field['value']
+            if 'apr' not in found and _APR_NAME_RE.search(field_name):
+                value = field.get('value', None)
+                if value:
+                    try:
+                        found['apr'] = float(str(value).replace('%', ''))
+                    except ValueError:
+                        pass
+            if 'payment_date' not in found and 'payment date' in field_name:
+                if field.get('value'):
+                    found['payment_date'] = field['value']
+            if 'loan_origination_date' not in found and (
+                    'origination date' in field_name or 'loan date' in field_name):
+                if field.get('value'):
+                    found['loan_origination_date'] = field['value']
+        
+        return found
+    
+    def _extract_loan_amount(self, line_fields: Dict, custom_fields: Dict) -> Optional[float]:
+        """Extract original loan amount from the scanned custom fields and line items."""
+        # Structured custom fields are the most reliable source
+        if 'loan_amount' in custom_fields:
+            return custom_fields['loan_amount']
+        return line_fields.get('loan_amount')
     
-    def _extract_outstanding_balance(self, response: Dict) -> Optional[float]:
+    def _extract_outstanding_balance(self, response: Dict, line_fields: Dict) -> Optional[float]:
         """Extract outstanding/principal balance from the response."""
         # Check for principal balance or outstanding balance
-        for item in response.get('line_items', []):
-            description = str(item.get('description', '')).lower()
-            if any(term in description for term in ['principal balance', 'outstanding balance', 
-                                                      'current balance', 'remaining balance']):
-                return item.get('total', None)
+        if 'outstanding_balance' in line_fields:
+            return line_fields['outstanding_balance']
         
         # Check total field as fallback
         total = response.get('total', None)
@@ -145,54 +395,31 @@ class MortgageStatementParser:
         
         return None
     
-    def _extract_apr(self, response: Dict) -> Optional[float]:
+    def _extract_apr(self, custom_fields: Dict, text: str) -> Optional[float]:
         """Extract APR (Annual Percentage Rate) from the response."""
-        text = response.get('ocr_text', '').lower()
+        # A structured custom field makes the OCR text sweep unnecessary
+        if 'apr' in custom_fields:
+            return custom_fields['apr']
         
         # Look for APR patterns in text
-        apr_patterns = [
-            r'apr[:\s]+(\d+\.?\d*)\s*%?',
-            r'annual percentage rate[:\s]+(\d+\.?\d*)\s*%?',
-            r'interest rate[:\s]+(\d+\.?\d*)\s*%?',
-        ]
-        
-        for pattern in apr_patterns:
-            match = re.search(pattern, text)
+        for pattern in _APR_RES:
+            match = pattern.search(text)
             if match:
                 return float(match.group(1))
         
-        # Check custom fields
-        for field in response.get('custom_fields', []):
-            field_name = str(field.get('name', '')).lower()
-            if 'apr' in field_name or 'interest rate' in field_name:
-                value = field.get('value', None)
-                if value:
-                    try:
-                        return float(str(value).replace('%', ''))
-                    except ValueError:
-                        pass
-        
         return None
     
-    def _extract_loan_terms(self, response: Dict) -> Optional[str]:
-        """Extract loan terms (e.g., '30 years', '15 years') from the response."""
-        text = response.get('ocr_text', '').lower()
-        
+    def _extract_loan_terms(self, text: str) -> Optional[str]:
+        """Extract loan terms (e.g., '30 years', '15 years') from the OCR text."""
         # Look for term patterns
-        term_patterns = [
-            r'(\d+)\s*year\s*(?:fixed|term|loan)?',
-            r'(\d+)\s*month\s*(?:term|loan)?',
-            r'loan term[:\s]+(\d+\s*(?:year|month)s?)',
-        ]
-        
-        for pattern in term_patterns:
-            match = re.search(pattern, text)
+        for pattern in _TERM_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(0).strip()
         
         return None
     
-    def _extract_property_address(self, response: Dict) -> Optional[str]:
+    def _extract_property_address(self, response: Dict, text: str) -> Optional[str]:
         """Extract property address from the response."""
         # Check vendor/bill to address
         vendor = response.get('vendor', {})
@@ -209,84 +436,81 @@ class MortgageStatementParser:
                 return address
         
         # Look in OCR text for address patterns
-        text = response.get('ocr_text', '')
-        # Simple address pattern (can be enhanced)
-        address_pattern = r'property(?:\s+address)?[:\s]+([^\n]+(?:\n[^\n]+)?)'
-        match = re.search(address_pattern, text.lower())
+        match = _ADDRESS_RE.search(text)
         if match:
             return match.group(1).strip()
         
         return None
     
-    def _extract_dates(self, response: Dict) -> Dict[str, Optional[str]]:
+    def _extract_dates(self, response: Dict, custom_fields: Dict, text: str) -> Dict[str, Optional[str]]:
         """Extract relevant dates from the response."""
-        dates = {
+        # Structured custom fields first; only sweep the OCR text for dates
+        # Veryfi didn't already extract
+        payment_date = custom_fields.get('payment_date')
+        if payment_date is None:
+            payment_match = _PAYMENT_DATE_RE.search(text)
+            if payment_match:
+                payment_date = payment_match.group(1)
+        
+        origination_date = custom_fields.get('loan_origination_date')
+        if origination_date is None:
+            origin_match = _ORIGIN_DATE_RE.search(text)
+            if origin_match:
+                origination_date = origin_match.group(1)
+        
+        return {
             'statement_date': response.get('date', None),
             'due_date': response.get('due_date', None),
-            'payment_date': None,
-            'loan_origination_date': None,
+            'payment_date': payment_date,
+            'loan_origination_date': origination_date,
         }
-        
-        # Look for additional dates in OCR text
-        text = response.get('ocr_text', '').lower()
-        
-        # Payment date pattern
-        payment_match = re.search(r'payment date[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
-        if payment_match:
-            dates['payment_date'] = payment_match.group(1)
-        
-        # Loan origination date pattern
-        origin_match = re.search(r'(?:loan|origination) date[:\s]+(\d{1,2}[-/]\d{1,2}[-/]\d{2,4})', text)
-        if origin_match:
-            dates['loan_origination_date'] = origin_match.group(1)
-        
-        return dates
     
-    def format_output(self, mortgage_data: Dict) -> str:
+    def format_output(self, mortgage_data: MortgageStatement) -> str:
         """
         Format the parsed mortgage data into a readable string.
         
         Args:
-            mortgage_data: Parsed mortgage data dictionary
+            mortgage_data: Parsed mortgage statement
             
         Returns:
             Formatted string representation
         """
-        parsed = mortgage_data.get('parsed_fields', {})
+        parsed = mortgage_data.parsed_fields
         
-        output = "=== Mortgage Statement Summary ===\n\n"
+        parts = ["=== Mortgage Statement Summary ===\n\n"]
         
-        if parsed.get('lender_name'):
-            output += f"Lender: {parsed['lender_name']}\n"
+        if parsed.lender_name:
+            parts.append(f"Lender: {parsed.lender_name}\n")
         
-        if parsed.get('loan_amount'):
-            output += f"Original Loan Amount: ${parsed['loan_amount']:,.2f}\n"
+        if parsed.loan_amount:
+            parts.append(f"Original Loan Amount: ${parsed.loan_amount:,.2f}\n")
         
-        if parsed.get('outstanding_balance'):
-            output += f"Outstanding Balance: ${parsed['outstanding_balance']:,.2f}\n"
+        if parsed.outstanding_balance:
+            parts.append(f"Outstanding Balance: ${parsed.outstanding_balance:,.2f}\n")
         
-        if parsed.get('apr'):
-            output += f"APR: {parsed['apr']}%\n"
+        if parsed.apr:
+            parts.append(f"APR: {parsed.apr}%\n")
         
-        if parsed.get('loan_terms'):
-            output += f"Loan Terms: {parsed['loan_terms']}\n"
+        if parsed.loan_terms:
+            parts.append(f"Loan Terms: {parsed.loan_terms}\n")
         
-        if parsed.get('property_address'):
-            output += f"Property Address: {parsed['property_address']}\n"
+        if parsed.property_address:
+            parts.append(f"Property Address: {parsed.property_address}\n")
         
-        if parsed.get('payment_amount'):
-            output += f"Payment Amount: ${parsed['payment_amount']:,.2f}\n"
+        if parsed.payment_amount:
+            parts.append(f"Payment Amount: ${parsed.payment_amount:,.2f}\n")
         
-        dates = parsed.get('dates', {})
+        dates = "".join(
+            f"{label}: {getattr(parsed, name)}\n"
+            for name, label in _DATE_LABELS.items()
+            if getattr(parsed, name)
+        )
         if dates:
-            output += "\n=== Important Dates ===\n"
-            for date_type, date_value in dates.items():
-                if date_value:
-                    formatted_type = date_type.replace('_', ' ').title()
-                    output += f"{formatted_type}: {date_value}\n"
+            parts.append("\n=== Important Dates ===\n")
+            parts.append(dates)
         
-        confidence = mortgage_data.get('confidence_score')
+        confidence = mortgage_data.confidence_score
         if confidence:
-            output += f"\nConfidence Score: {confidence}\n"
+            parts.append(f"\nConfidence Score: {confidence}\n")
         
-        return output
+        return "".join(parts)
@@ -62,7 +62,8 @@ def test_field_extraction_methods():
             '_extract_property_address',
             '_extract_dates',
             '_extract_mortgage_fields',
-            'format_output'
+            'format_output',
+            'parse_many'
         ]
         
         for method in methods:
@@ -81,7 +82,7 @@ def test_format_output():
     """Test the format_output method with sample data"""
     print("\nTest 4: Testing format_output method...")
     try:
-        from mortgage_parser import MortgageStatementParser
+        from mortgage_parser import MortgageStatementParser, MortgageStatement, ParsedFields
         
         parser = MortgageStatementParser(
             client_id="test_id",
@@ -91,22 +92,20 @@ def test_format_output():
         )
         
         # Create sample mortgage data
-        sample_data = {
-            'parsed_fields': {
-                'lender_name': 'Test Bank',
-                'loan_amount': 350000.00,
-                'outstanding_balance': 287450.23,
-                'apr': 3.75,
-                'loan_terms': '30 year fixed',
-                'property_address': '123 Main St, Anytown, ST 12345',
-                'payment_amount': 1620.50,
-                'dates': {
-                    'statement_date': '2024-01-15',
-                    'due_date': '2024-02-01'
-                }
-            },
-            'confidence_score': 0.98
-        }
+        sample_data = MortgageStatement(
+            parsed_fields=ParsedFields(
+                lender_name='Test Bank',
+                loan_amount=350000.00,
+                outstanding_balance=287450.23,
+                apr=3.75,
+                loan_terms='30 year fixed',
+                property_address='123 Main St, Anytown, ST 12345',
+                payment_amount=1620.50,
+                statement_date='2024-01-15',
+                due_date='2024-02-01'
+            ),
+            confidence_score=0.98
+        )
         
         output = parser.format_output(sample_data)
         
@@ -117,7 +116,8 @@ def test_format_output():
             '$287,450.23',
             '3.75%',
             '30 year fixed',
-            '123 Main St'
+            '123 Main St',
+            'Due Date: 2024-02-01'
         ]
         
         for expected in expected_strings:
@@ -168,31 +168,31 @@ def test_extraction_with_mock_data():
         result = parser._extract_mortgage_fields(mock_response)
         
         # Verify structure
-        if 'parsed_fields' not in result:
+        if result.parsed_fields is None:
             print("✗ Missing parsed_fields in result")
             return False
         
-        parsed = result['parsed_fields']
+        parsed = result.parsed_fields
         
         # Check that APR was extracted
-        if parsed['apr'] == 3.75:
+        if parsed.apr == 3.75:
             print("✓ APR extracted correctly: 3.75%")
         else:
-            print(f"✗ APR extraction failed. Got: {parsed['apr']}")
+            print(f"✗ APR extraction failed. Got: {parsed.apr}")
             return False
         
         # Check that outstanding balance was extracted
-        if parsed['outstanding_balance'] == 287450.23:
+        if parsed.outstanding_balance == 287450.23:
             print("✓ Outstanding balance extracted correctly: $287,450.23")
         else:
-            print(f"✗ Balance extraction failed. Got: {parsed['outstanding_balance']}")
+            print(f"✗ Balance extraction failed. Got: {parsed.outstanding_balance}")
             return False
         
         # Check that loan terms were extracted
-        if '30 year' in str(parsed['loan_terms']):
+        if '30 year' in str(parsed.loan_terms):
             print("✓ Loan terms extracted correctly")
         else:
-            print(f"✗ Loan terms extraction failed. Got: {parsed['loan_terms']}")
+            print(f"✗ Loan terms extraction failed. Got: {parsed.loan_terms}")
         
         print("✓ Field extraction works with mock data")
         return True
@@ -203,6 +203,259 @@ def test_extraction_with_mock_data():
         return False
 
 
+def test_raw_response_opt_in():
+    """Test that the raw Veryfi response is only kept when requested"""
+    print("\nTest 6: Testing raw response retention...")
+    try:
+        from mortgage_parser import MortgageStatementParser
+        
+        parser = MortgageStatementParser(
+            client_id="test_id",
+            client_secret="test_secret",
+            username="test_user",
+            api_key="test_key"
+        )
+        
+        mock_response = {'ocr_text': 'APR: 3.75%', 'line_items': [], 'custom_fields': []}
+        
+        if parser._extract_mortgage_fields(mock_response).raw_response is not None:
+            print("✗ raw_response kept without keep_raw")
+            return False
+        
+        result = parser._extract_mortgage_fields(mock_response, keep_raw=True)
+        if result.raw_response is not mock_response:
+            print("✗ raw_response missing with keep_raw=True")
+            return False
+        
+        print("✓ raw_response only kept with keep_raw=True")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing raw response retention: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_custom_fields_take_priority():
+    """Test that structured custom fields win over line items and OCR text"""
+    print("\nTest 7: Testing custom field priority...")
+    try:
+        from mortgage_parser import MortgageStatementParser
+        
+        parser = MortgageStatementParser(
+            client_id="test_id",
+            client_secret="test_secret",
+            username="test_user",
+            api_key="test_key"
+        )
+        
+        mock_response = {
+            'ocr_text': 'APR: 3.75% Payment Date: 01/01/2024',
+            'line_items': [{'description': 'Original Loan Amount', 'total': 300000.00}],
+            'custom_fields': [
+                {'name': 'Interest Rate', 'value': '4.25%'},
+                {'name': 'Loan Amount', 'value': 350000.00},
+                {'name': 'Payment Date', 'value': '02/01/2024'}
+            ]
+        }
+        
+        parsed = parser._extract_mortgage_fields(mock_response).parsed_fields
+        
+        if parsed.apr != 4.25:
+            print(f"✗ APR should come from custom fields. Got: {parsed.apr}")
+            return False
+        
+        if parsed.loan_amount != 350000.00:
+            print(f"✗ Loan amount should come from custom fields. Got: {parsed.loan_amount}")
+            return False
+        
+        if parsed.payment_date != '02/01/2024':
+            print(f"✗ Payment date should come from custom fields. Got: {parsed.payment_date}")
+            return False
+        
+        # An empty custom field falls back to the line items
+        mock_response['custom_fields'] = [{'name': 'Loan Amount', 'value': None}]
+        parsed = parser._extract_mortgage_fields(mock_response).parsed_fields
+        
+        if parsed.loan_amount != 300000.00:
+            print(f"✗ Empty custom loan amount should fall back to line items. Got: {parsed.loan_amount}")
+            return False
+        
+        print("✓ Custom fields take priority")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing custom field priority: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_parse_many_preserves_order():
+    """Test that concurrent batch parsing returns results in input order"""
+    print("\nTest 8: Testing parse_many ordering...")
+    try:
+        import time
+        from mortgage_parser import MortgageStatementParser
+        
+        parser = MortgageStatementParser(
+            client_id="test_id",
+            client_secret="test_secret",
+            username="test_user",
+            api_key="test_key"
+        )
+        
+        class MockClient:
+            """Stands in for the Veryfi client; later files finish first"""
+            def process_document(self, file_path, categories=None):
+                time.sleep(0.01 * (5 - int(file_path)))
+                return {'ocr_text': f'APR: {file_path}.5%', 'line_items': [], 'custom_fields': []}
+        
+        parser.client = MockClient()
+        results = parser.parse_many(['1', '2', '3', '4'], max_workers=4)
+        aprs = [result.parsed_fields.apr for result in results]
+        
+        if aprs != [1.5, 2.5, 3.5, 4.5]:
+            print(f"✗ Results out of order. Got: {aprs}")
+            return False
+        
+        print("✓ parse_many returns results in input order")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing parse_many: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_parse_many_collects_failures():
+    """Test that one failed document doesn't discard the rest of a batch"""
+    print("\nTest 9: Testing parse_many failure handling...")
+    try:
+        from mortgage_parser import MortgageStatementParser
+        
+        parser = MortgageStatementParser(
+            client_id="test_id",
+            client_secret="test_secret",
+            username="test_user",
+            api_key="test_key"
+        )
+        
+        class MockClient:
+            """Stands in for the Veryfi client; file '2' fails to upload"""
+            def process_document(self, file_path, categories=None):
+                if file_path == '2':
+                    raise RuntimeError("400 Bad Request")
+                return {'ocr_text': f'APR: {file_path}.5%', 'line_items': [], 'custom_fields': []}
+        
+        parser.client = MockClient()
+        results = parser.parse_many(['1', '2', '3'], max_workers=3, return_exceptions=True)
+        
+        if not isinstance(results[1], RuntimeError):
+            print(f"✗ Failed document should hold its exception. Got: {results[1]!r}")
+            return False
+        
+        if [results[0].parsed_fields.apr, results[2].parsed_fields.apr] != [1.5, 3.5]:
+            print("✗ Successful documents missing from batch results")
+            return False
+        
+        try:
+            parser.parse_many(['1', '2', '3'], max_workers=3)
+        except RuntimeError:
+            pass
+        else:
+            print("✗ parse_many should raise without return_exceptions")
+            return False
+        
+        print("✓ parse_many reports failures per document")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing parse_many failures: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_json_output_matches_without_orjson():
+    """Test that the stdlib JSON fallback writes the same UTF-8 bytes as orjson"""
+    print("\nTest 10: Testing JSON output with and without orjson...")
+    try:
+        import io
+        import app
+        from mortgage_parser import MortgageStatement, ParsedFields
+        
+        data = MortgageStatement(
+            parsed_fields=ParsedFields(lender_name='Bänk', property_address='12 Rue Éé'),
+            raw_response={'vendor': {'name': 'Bänk'}}
+        )
+        
+        saved = sys.modules.get('orjson')
+        sys.modules['orjson'] = None
+        try:
+            fallback = io.BytesIO()
+            app.write_json(data, fallback)
+        finally:
+            if saved is None:
+                del sys.modules['orjson']
+            else:
+                sys.modules['orjson'] = saved
+        
+        if 'Bänk'.encode('utf-8') not in fallback.getvalue():
+            print("✗ Fallback output is not raw UTF-8")
+            return False
+        
+        try:
+            import orjson
+        except ImportError:
+            print("✓ Fallback writes raw UTF-8 (orjson not installed)")
+            return True
+        
+        fast = io.BytesIO()
+        app.write_json(data, fast)
+        if fast.getvalue() != fallback.getvalue():
+            print("✗ orjson and stdlib JSON output differ")
+            return False
+        
+        print("✓ JSON output is identical with and without orjson")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing JSON output: {e}")
+        traceback.print_exc()
+        return False
+
+
+def test_help_text_in_sync():
+    """Test that the pre-rendered CLI help lists every parser option"""
+    print("\nTest 11: Testing pre-rendered help text...")
+    try:
+        import app
+        
+        parser = app.build_parser(full_help=True)
+        
+        for action in parser._actions:
+            for expected in action.option_strings + [action.help]:
+                if expected not in app.HELP_TEXT:
+                    print(f"✗ Expected string not found in HELP_TEXT: {expected}")
+                    return False
+        
+        if parser.epilog not in app.HELP_TEXT:
+            print("✗ Examples epilog missing from HELP_TEXT")
+            return False
+        
+        # Every spelling argparse accepts as help must take the HELP_TEXT path
+        for argv in (['-h'], ['--help'], ['--h'], ['--he'], ['--hel'], ['statement.pdf', '--help']):
+            if not app.wants_help(argv):
+                print(f"✗ Help request not detected: {argv}")
+                return False
+        
+        if (app.wants_help(['--']) or app.wants_help(['statement.pdf', '--url'])
+                or app.wants_help(['--', '-h']) or app.wants_help(['--', '--help'])):
+            print("✗ Non-help arguments detected as help")
+            return False
+        
+        print("✓ HELP_TEXT matches the argument parser")
+        return True
+    except Exception as e:
+        print(f"✗ Error testing help text: {e}")
+        traceback.print_exc()
+        return False
+
+
 def main():
     """Run all tests"""
     print("="*60)
@@ -214,7 +467,13 @@ def main():
         test_parser_initialization,
         test_field_extraction_methods,
         test_format_output,
-        test_extraction_with_mock_data
+        test_extraction_with_mock_data,
+        test_raw_response_opt_in,
+        test_custom_fields_take_priority,
+        test_parse_many_preserves_order,
+        test_parse_many_collects_failures,
+        test_json_output_matches_without_orjson,
+        test_help_text_in_sync
     ]
     
     results = []